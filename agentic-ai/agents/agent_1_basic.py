@@ -4,6 +4,9 @@ from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langchain.agents import create_agent
+from http_pool import http_client, http_async_client
+from model_router import ModelRouter
+from tracing import traced, print_trace_summary
 
 load_dotenv()
 
@@ -13,8 +16,11 @@ model = ChatOpenAI(
     # model="gpt-4o-mini", #Open router
     model="gpt-4o", # Model zoo
     temperature=1,
-    base_url= OPENAI_API_BASE
+    base_url= OPENAI_API_BASE,
+    http_client=http_client,  # Shared connection pool
+    http_async_client=http_async_client,
 )
+router = ModelRouter(large=model)  # Simple prompts go to the fast model, hard ones stay here
 
 @tool
 def web_search(query: str) -> str:
@@ -26,7 +32,8 @@ def web_search(query: str) -> str:
 tools = [web_search]
 
 agent = create_agent(model=model, tools=tools,
-        system_prompt="You are a helpful agent that uses tools to answer questions accurately.")
+        system_prompt="You are a helpful agent that uses tools to answer questions accurately.",
+        middleware=[router.middleware()])
 
 # agent = create_agent(
 #     model=model, tools=tools,
@@ -34,13 +41,18 @@ agent = create_agent(model=model, tools=tools,
 # )
 
 
-inputs = {"messages": [("user", "What is the correct roadmap to learn PostgreSQL?")]} # No tools used
+if __name__ == "__main__":
+    inputs = {"messages": [("user", "What is the correct roadmap to learn PostgreSQL?")]} # No tools used
 
-# inputs = {"messages": [("user", "What are the latest news about agentic AI in 2026?")]} # Tools used
+    # inputs = {"messages": [("user", "What are the latest news about agentic AI in 2026?")]} # Tools used
 
-for chunk in agent.stream(inputs, stream_mode="updates"):
-    if "model" in chunk:
-        print(chunk["model"]["messages"][-1].content)
+    config = traced({"configurable": {"thread_id": "agent-1-demo"}})  # Adds the tracer when AGENT_TRACE=1
+    for chunk in agent.stream(inputs, config=config, stream_mode="updates"):
+        if "model" in chunk:
+            print(chunk["model"]["messages"][-1].content)
+
+    print("\n" + router.report())
+    print_trace_summary()
 
 
 # Notes: If we ask question which can be answered without using tools, then agent will not use tools,
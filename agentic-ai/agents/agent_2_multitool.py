@@ -7,6 +7,9 @@ from langchain_openai import ChatOpenAI
 from langchain_community.tools import DuckDuckGoSearchResults  # Built-in
 from langchain_core.tools import tool
 from langchain.agents import create_agent
+from http_pool import http_client, http_async_client
+from model_router import ModelRouter
+from tracing import traced, print_trace_summary
 
 load_dotenv()
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
@@ -15,8 +18,11 @@ model = ChatOpenAI(
     # model="gpt-4o-mini", #Open router
     model="gpt-5.1", # Model zoo
     temperature=0, # Deterministic for testing, change to 1 for more creativity
-    base_url= OPENAI_API_BASE
+    base_url= OPENAI_API_BASE,
+    http_client=http_client,  # Shared connection pool
+    http_async_client=http_async_client,
 )
+router = ModelRouter(large=model)  # Simple prompts go to the fast model, hard ones stay here
 
 search = DuckDuckGoSearchResults()  # Real search!
 
@@ -174,28 +180,34 @@ agent = create_agent(
         "For Indian stocks always append .NS for NSE or .BO for BSE to the ticker symbol. "
         "Use search for general facts, calculator for math, weather for location queries, "
         "and get_stock_info for any stock market question. Reason step-by-step."
-    )
+    ),
+    middleware=[router.middleware()],
 )
 
-# --- Questions to ask the agent ---
-# Add or remove questions here; they will be joined into a single prompt automatically.
-questions = [
-    "What is the current stock price of Reliance Industries and TCS?",
-    "What's the weather in Bangalore?",
-    "Search the latest LangChain version over the web.",
-    "How do we fine tune a language model on custom data?",
-    "If revenue is $500k and cost is $350k, what's the profit?",
-]
-
-combined_prompt = " ".join(questions)
-print(f">>> Prompt: {combined_prompt}\n")
-
-inputs = {
-    "messages": [("user", combined_prompt)]
-}
-count = 0
-for chunk in agent.stream(inputs, stream_mode="updates"):
-    count += 1
-    print('>>> Received chunk number:', count)  # Debug line to see all chunks
-    if "model" in chunk:
-        print(chunk["model"]["messages"][-1].content)
+if __name__ == "__main__":
+    # --- Questions to ask the agent ---
+    # Add or remove questions here; they will be joined into a single prompt automatically.
+    questions = [
+        "What is the current stock price of Reliance Industries and TCS?",
+        "What's the weather in Bangalore?",
+        "Search the latest LangChain version over the web.",
+        "How do we fine tune a language model on custom data?",
+        "If revenue is $500k and cost is $350k, what's the profit?",
+    ]
+
+    combined_prompt = " ".join(questions)
+    print(f">>> Prompt: {combined_prompt}\n")
+
+    inputs = {
+        "messages": [("user", combined_prompt)]
+    }
+    count = 0
+    config = traced({"configurable": {"thread_id": "agent-2-demo"}})  # Adds the tracer when AGENT_TRACE=1
+    for chunk in agent.stream(inputs, config=config, stream_mode="updates"):
+        count += 1
+        print('>>> Received chunk number:', count)  # Debug line to see all chunks
+        if "model" in chunk:
+            print(chunk["model"]["messages"][-1].content)
+
+    print("\n" + router.report())
+    print_trace_summary()
@@ -6,6 +6,9 @@ from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.tools import tool
 from langchain.agents import create_agent
 from langgraph.checkpoint.memory import MemorySaver
+from http_pool import http_client, http_async_client
+from model_router import ModelRouter
+from tracing import traced, print_trace_summary
 
 load_dotenv()
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
@@ -14,8 +17,11 @@ model = ChatOpenAI(
     # model="gpt-4o-mini", #Open router
     model="gpt-4o", # Model zoo
     temperature=0,
-    base_url= OPENAI_API_BASE
+    base_url= OPENAI_API_BASE,
+    http_client=http_client,  # Shared connection pool
+    http_async_client=http_async_client,
 )
+router = ModelRouter(large=model)  # Simple prompts go to the fast model, hard ones stay here
 
 search = DuckDuckGoSearchRun()
 
@@ -31,19 +37,24 @@ agent = create_agent(
     model=model, 
     tools=tools,
     system_prompt="You are a helpful agent that uses tools to answer questions accurately.",
-    checkpointer=memory
+    checkpointer=memory,
+    middleware=[router.middleware()],
 )
 
-config = {"configurable": {"thread_id": "abc123"}}  # Session ID
+if __name__ == "__main__":
+    config = traced({"configurable": {"thread_id": "abc123"}})  # Session ID (+ tracer when AGENT_TRACE=1)
 
-# First interaction
-input1 = {"messages": [("user", "What is LangGraph? Search if needed.")]}
-for chunk in agent.stream(input1, config=config, stream_mode="updates"):
-    if "model" in chunk:
-        print('Turn 1:', chunk["model"]["messages"][-1].content)
+    # First interaction
+    input1 = {"messages": [("user", "What is LangGraph? Search if needed.")]}
+    for chunk in agent.stream(input1, config=config, stream_mode="updates"):
+        if "model" in chunk:
+            print('Turn 1:', chunk["model"]["messages"][-1].content)
 
-# Follow-up (remembers prior!)
-input2 = {"messages": [("user", "Summarize notes from before.")]}
-for chunk in agent.stream(input2, config=config, stream_mode="updates"):
-    if "model" in chunk:
-        print('Turn 2:', chunk["model"]["messages"][-1].content)
+    # Follow-up (remembers prior!)
+    input2 = {"messages": [("user", "Summarize notes from before.")]}
+    for chunk in agent.stream(input2, config=config, stream_mode="updates"):
+        if "model" in chunk:
+            print('Turn 2:', chunk["model"]["messages"][-1].content)
+
+    print("\n" + router.report())
+    print_trace_summary()
@@ -1,6 +1,7 @@
 # file: agent_4_langgraph.py
 import os
-from typing import Literal
+import time
+from typing import Annotated
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_community.tools import DuckDuckGoSearchRun
@@ -8,15 +9,20 @@ from langchain_core.tools import tool
 from langchain_core.messages import HumanMessage, AIMessage
 from langgraph.graph import END, StateGraph, MessagesState
 from langgraph.checkpoint.memory import MemorySaver
+from http_pool import http_client, http_async_client
+from tracing import traced, print_trace_summary
 
 load_dotenv()
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
+MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "4"))  # Max specialists running at once
 
 model = ChatOpenAI(
     # model="gpt-4o-mini", #Open router
     model="gpt-4o", # Model zoo
     temperature=0,
-    base_url= OPENAI_API_BASE
+    base_url= OPENAI_API_BASE,
+    http_client=http_client,  # Shared connection pool
+    http_async_client=http_async_client,
 )
 
 search = DuckDuckGoSearchRun()
@@ -32,62 +38,76 @@ def summarize(topic: str) -> str:
     """Generate concise summary."""
     return f"Summary for {topic}: Autonomous, tool-using AI systems."
 
+def merge_timings(left: dict, right: dict) -> dict:
+    """Reducer so parallel specialists can each report their own timing."""
+    return {**left, **right}
+
+# Graph state: messages plus explicit completion flags set by each specialist
+class WorkflowState(MessagesState):
+    research_done: bool
+    calc_done: bool
+    summary_done: bool
+    step_timings: Annotated[dict[str, float], merge_timings]
+
+# Each specialist: the flag it sets when finished, and the specialists it waits for.
+# Specialists with no pending dependencies run concurrently in the same superstep.
+TASKS = {
+    "researcher": {"flag": "research_done", "depends_on": []},
+    "calculator": {"flag": "calc_done", "depends_on": []},
+    "summarizer": {"flag": "summary_done", "depends_on": ["researcher", "calculator"]},
+}
+
 # Supervisor decides routing based on tasks completed
-def supervisor(state: MessagesState) -> Literal["researcher", "calculator", "summarizer", "__end__"]:
-    messages = state["messages"]
-    
-    # Track what's been done by checking AI messages
-    ai_messages = [msg for msg in messages if isinstance(msg, AIMessage)]
-    
-    has_research = any("research results" in msg.content.lower() for msg in ai_messages)
-    has_calc = any("calculated profit" in msg.content.lower() for msg in ai_messages)
-    has_summary = any("final summary" in msg.content.lower() for msg in ai_messages)
-    
-    # Execute in order: research → calculate → summarize → end
-    if not has_research:
-        return "researcher"
-    elif not has_calc:
-        return "calculator"
-    elif not has_summary:
-        return "summarizer"
-    else:
-        return "__end__"
+def supervisor(state: WorkflowState) -> list[str] | str:
+    # Fan out to every pending task whose dependencies are done; end when nothing is left
+    done = {name for name, task in TASKS.items() if state.get(task["flag"])}
+    ready = [
+        name for name, task in TASKS.items()
+        if name not in done and all(dep in done for dep in task["depends_on"])
+    ]
+    return ready or END
 
 # Specialist functions
-def research_agent(state: MessagesState):
-    messages = state["messages"]
+def research_agent(state: WorkflowState):
     query = "What is LangGraph"
     result = search.invoke(query)
     response = AIMessage(content=f"Research results for LangGraph: {result[:300]}...")
-    return {"messages": [response]}
+    return {"messages": [response], "research_done": True}
 
-def calculator_agent(state: MessagesState):
-    messages = state["messages"]
+def calculator_agent(state: WorkflowState):
     # Extract revenue and cost from original message
     revenue = 1000000  # $1M
     cost = 700000      # $700k
     profit = profit_calc.invoke({"revenue": revenue, "cost": cost})
     response = AIMessage(content=f"Calculated profit: Revenue ${revenue:,} - Cost ${cost:,} = Profit ${profit:,}")
-    return {"messages": [response]}
+    return {"messages": [response], "calc_done": True}
 
-def summarizer_agent(state: MessagesState):
-    messages = state["messages"]
+def summarizer_agent(state: WorkflowState):
     summary_text = summarize.invoke({"topic": "LangGraph and profit calculation"})
     response = AIMessage(content=f"Final {summary_text}")
-    return {"messages": [response]}
+    return {"messages": [response], "summary_done": True}
 
 # Build the graph
-workflow = StateGraph(MessagesState)
+workflow = StateGraph(WorkflowState)
 
 # Add supervisor node (doesn't do anything, just routes)
-def supervisor_node(state: MessagesState):
-    return {"messages": state["messages"]}
+def supervisor_node(state: WorkflowState):
+    return {}
+
+# Wrap a specialist so it reports its own wall-clock time in the state update
+def timed(name, agent_fn):
+    def node(state: WorkflowState):
+        t0 = time.perf_counter()
+        update = agent_fn(state)
+        update["step_timings"] = {name: time.perf_counter() - t0}
+        return update
+    return node
 
 # Add nodes
 workflow.add_node("supervisor", supervisor_node)
-workflow.add_node("researcher", research_agent)
-workflow.add_node("calculator", calculator_agent) 
-workflow.add_node("summarizer", summarizer_agent)
+workflow.add_node("researcher", timed("researcher", research_agent))
+workflow.add_node("calculator", timed("calculator", calculator_agent))
+workflow.add_node("summarizer", timed("summarizer", summarizer_agent))
 
 # Set entry point and routing
 workflow.set_entry_point("supervisor")
@@ -98,11 +118,11 @@ workflow.add_conditional_edges(
         "researcher": "researcher",
         "calculator": "calculator",
         "summarizer": "summarizer",
-        "__end__": END
+        END: END
     }
 )
 
-# After each specialist, route back to supervisor
+# After each specialist, route back to supervisor (parallel branches rejoin here in one step)
 workflow.add_edge("researcher", "supervisor")
 workflow.add_edge("calculator", "supervisor")
 workflow.add_edge("summarizer", "supervisor")
@@ -110,13 +130,30 @@ workflow.add_edge("summarizer", "supervisor")
 memory = MemorySaver()
 app = workflow.compile(checkpointer=memory)
 
-# Multi-turn demo
-config = {"configurable": {"thread_id": "multi-agent-session"}}
-inputs = {"messages": [HumanMessage(content="Research LangGraph, calculate profit for $1M rev/$700k cost, then summarize.")]}
+# Start a new turn on a thread: append the request and clear completion flags from earlier turns
+def make_inputs(request: str):
+    return {
+        "messages": [HumanMessage(content=request)],
+        **{task["flag"]: False for task in TASKS.values()},
+    }
 
-print("=== Multi-Agent Workflow Execution ===\n")
-for i, chunk in enumerate(app.stream(inputs, config, stream_mode="values")):
-    if "messages" in chunk and len(chunk["messages"]) > 0:
-        print(f"--- Step {i+1} ---")
-        print(chunk["messages"][-1].content)
-        print()
+if __name__ == "__main__":
+    # Multi-turn demo
+    config = traced({"configurable": {"thread_id": "multi-agent-session"}, "max_concurrency": MAX_CONCURRENCY})
+    inputs = make_inputs("Research LangGraph, calculate profit for $1M rev/$700k cost, then summarize.")
+
+    print("=== Multi-Agent Workflow Execution ===\n")
+    print(">>>", inputs["messages"][0].content, "\n")
+    t_start = time.perf_counter()
+    step = 0
+    for chunk in app.stream(inputs, config, stream_mode="updates"):
+        for node, update in chunk.items():
+            if not update or "messages" not in update:
+                continue  # supervisor passes carry no output
+            step += 1
+            elapsed = update["step_timings"][node]
+            print(f"--- Step {step}: {node} ({elapsed:.2f}s) ---")
+            print(update["messages"][-1].content)
+            print()
+    print(f"Total wall time: {time.perf_counter() - t_start:.2f}s (max_concurrency={MAX_CONCURRENCY})")
+    print_trace_summary()
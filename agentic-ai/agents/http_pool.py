@@ -0,0 +1,21 @@
+# file: http_pool.py
+# Shared HTTP connection pool for every ChatOpenAI client in this process.
+# Each agent script passes these clients to ChatOpenAI, so when several agents are
+# hosted together (see session_runner.py) they reuse the same keep-alive connections
+# instead of each opening its own pool.
+import os
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+
+limits = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+)
+
+http_client = httpx.Client(limits=limits)               # Used by .invoke() / .stream()
+http_async_client = httpx.AsyncClient(limits=limits)    # Used by .ainvoke() / .astream()
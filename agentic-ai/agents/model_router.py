@@ -0,0 +1,151 @@
+# file: model_router.py
+# Latency-aware routing between a fast, cheap model and the large model.
+#
+# Short, simple requests go to FAST_MODEL; long conversations, long prompts or prompts
+# containing "hard" keywords go to the large model. If the fast model raises or returns
+# an empty answer, the same request is retried once on the large model.
+# Every call is recorded per route (calls, escalations, latency, tokens) so the
+# thresholds below can be tuned from real traffic.
+import os
+import time
+from collections import defaultdict
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
+from langchain.agents.middleware import AgentMiddleware
+from http_pool import http_client, http_async_client
+
+load_dotenv()
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
+
+FAST_MODEL = os.getenv("FAST_MODEL", "gpt-4o-mini")
+ROUTER_MAX_FAST_CHARS = int(os.getenv("ROUTER_MAX_FAST_CHARS", "400"))        # Longest prompt the fast model gets
+ROUTER_MAX_FAST_MESSAGES = int(os.getenv("ROUTER_MAX_FAST_MESSAGES", "8"))     # Longest conversation the fast model gets
+ROUTER_ESCALATE_KEYWORDS = [
+    k.strip() for k in os.getenv(
+        "ROUTER_ESCALATE_KEYWORDS", "explain,compare,analyze,design,roadmap,step-by-step,fine tune"
+    ).split(",") if k.strip()
+]
+
+
+class ModelRouter:
+    def __init__(self, large, fast=None,
+                 max_fast_chars=ROUTER_MAX_FAST_CHARS,
+                 max_fast_messages=ROUTER_MAX_FAST_MESSAGES,
+                 escalate_keywords=ROUTER_ESCALATE_KEYWORDS):
+        self.large = large
+        self.fast = fast or ChatOpenAI(
+            model=FAST_MODEL,
+            temperature=large.temperature,  # Keep the agent's own creativity setting
+            base_url=OPENAI_API_BASE,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+        self.max_fast_chars = max_fast_chars
+        self.max_fast_messages = max_fast_messages
+        self.escalate_keywords = [k.lower() for k in escalate_keywords]
+        self.stats = defaultdict(lambda: {
+            "calls": 0, "failures": 0, "escalations": 0,
+            "latency_s": 0.0, "input_tokens": 0, "output_tokens": 0,
+        })
+
+    # --- Routing heuristics ---
+    def pick(self, messages) -> str:
+        """Return "fast" or "large" for a list of chat messages."""
+        if len(messages) > self.max_fast_messages:
+            return "large"
+        last_user = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        text = (last_user.text if last_user else "").lower()
+        if len(text) > self.max_fast_chars:
+            return "large"
+        if any(k in text for k in self.escalate_keywords):
+            return "large"
+        return "fast"
+
+    # --- Bookkeeping ---
+    def _record(self, route, t0, message=None, failed=False):
+        s = self.stats[route]
+        s["calls"] += 1
+        s["latency_s"] += time.perf_counter() - t0
+        if failed:
+            s["failures"] += 1
+        usage = getattr(message, "usage_metadata", None) or {}
+        s["input_tokens"] += usage.get("input_tokens", 0)
+        s["output_tokens"] += usage.get("output_tokens", 0)
+
+    @staticmethod
+    def _is_empty(message):
+        return not message.content and not getattr(message, "tool_calls", None)
+
+    def _fast_succeeded(self, t0, response=None, error=None) -> bool:
+        """Record one fast-model attempt; False means escalate the request to the large model."""
+        message = response.result[0] if response is not None else None
+        ok = error is None and not self._is_empty(message)
+        if error is not None:
+            print(f"[router] fast model failed ({type(error).__name__}), escalating")
+        self._record("fast", t0, message, failed=not ok)
+        if not ok:
+            self.stats["fast"]["escalations"] += 1
+        return ok
+
+    def report(self) -> str:
+        lines = [f"{'route':<6} {'calls':>5} {'fail':>4} {'esc':>4} {'avg_s':>7} {'in_tok':>8} {'out_tok':>8}"]
+        for route in ("fast", "large"):
+            s = self.stats[route]
+            avg = s["latency_s"] / s["calls"] if s["calls"] else 0.0
+            esc = s["escalations"] if route == "fast" else "-"  # Only fast calls escalate
+            lines.append(
+                f"{route:<6} {s['calls']:>5} {s['failures']:>4} {esc:>4} "
+                f"{avg:>7.2f} {s['input_tokens']:>8} {s['output_tokens']:>8}"
+            )
+        return "\n".join(lines)
+
+    # --- create_agent integration ---
+    def middleware(self):
+        return _RouterMiddleware(self)
+
+
+class _RouterMiddleware(AgentMiddleware):
+    """Swaps the model on each agent step; tools are bound by create_agent after the swap."""
+
+    def __init__(self, router):
+        super().__init__()
+        self.router = router
+
+    def wrap_model_call(self, request, handler):
+        router = self.router
+        if router.pick(request.messages) == "fast":
+            t0, response, error = time.perf_counter(), None, None
+            try:
+                response = handler(request.override(model=router.fast))
+            except Exception as e:
+                error = e
+            if router._fast_succeeded(t0, response, error):
+                return response
+        t0 = time.perf_counter()
+        try:
+            response = handler(request.override(model=router.large))
+        except Exception:
+            router._record("large", t0, failed=True)  # Nothing left to escalate to
+            raise
+        router._record("large", t0, response.result[0])
+        return response
+
+    async def awrap_model_call(self, request, handler):
+        router = self.router
+        if router.pick(request.messages) == "fast":
+            t0, response, error = time.perf_counter(), None, None
+            try:
+                response = await handler(request.override(model=router.fast))
+            except Exception as e:
+                error = e
+            if router._fast_succeeded(t0, response, error):
+                return response
+        t0 = time.perf_counter()
+        try:
+            response = await handler(request.override(model=router.large))
+        except Exception:
+            router._record("large", t0, failed=True)  # Nothing left to escalate to
+            raise
+        router._record("large", t0, response.result[0])
+        return response
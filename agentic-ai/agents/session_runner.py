@@ -0,0 +1,133 @@
+# file: session_runner.py
+# Hosts agents 1-4 behind one process and serves many user sessions concurrently.
+#
+# - Every agent is imported once; the ChatOpenAI clients share one HTTP pool (http_pool.py).
+# - Each session is identified by (agent name, thread_id). Turns of the same session run
+#   one at a time so checkpointed history is never interleaved; different sessions run in parallel.
+# - Admission control: at most RUNNER_MAX_ACTIVE turns stream at once, up to RUNNER_MAX_QUEUED
+#   more wait for a slot or for an earlier turn of their session, anything beyond that is
+#   rejected with RunnerAtCapacity.
+import os
+import asyncio
+import time
+from dotenv import load_dotenv
+
+import agent_1_basic
+import agent_2_multitool
+import agent_3_memory
+import agent_4_langgraph
+from tracing import traced, print_trace_summary
+
+load_dotenv()
+
+RUNNER_MAX_ACTIVE = int(os.getenv("RUNNER_MAX_ACTIVE", "8"))
+RUNNER_MAX_QUEUED = int(os.getenv("RUNNER_MAX_QUEUED", "32"))
+
+
+def chat_inputs(request: str):
+    return {"messages": [("user", request)]}
+
+
+# name -> (compiled agent / graph, function building the input for one turn)
+AGENTS = {
+    "basic": (agent_1_basic.agent, chat_inputs),
+    "multitool": (agent_2_multitool.agent, chat_inputs),
+    "memory": (agent_3_memory.agent, chat_inputs),
+    "langgraph": (agent_4_langgraph.app, agent_4_langgraph.make_inputs),
+}
+
+
+class RunnerAtCapacity(Exception):
+    """Raised when the wait queue (turns waiting for a slot or for their session) is full."""
+
+
+class SessionRunner:
+    def __init__(self, agents=AGENTS, max_active=RUNNER_MAX_ACTIVE, max_queued=RUNNER_MAX_QUEUED):
+        self.agents = agents
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self._slots = asyncio.Semaphore(max_active)
+        self._queued = 0
+        self._sessions = {}  # (agent name, thread_id) -> [lock, number of turns holding/awaiting it]
+
+    @property
+    def queued(self):
+        return self._queued
+
+    async def astream(self, agent_name: str, thread_id: str, request: str):
+        """Stream one turn of a session, yielding LangGraph "updates" chunks."""
+        if agent_name not in self.agents:
+            raise KeyError(f"Unknown agent '{agent_name}'. Available: {', '.join(self.agents)}")
+        # Turns waiting on a busy session count as queued too, so one client can't
+        # pile up turns behind its own thread while global slots are still free
+        if self._queued >= self.max_queued:
+            raise RunnerAtCapacity(
+                f"{self._queued} turns already queued (max {self.max_queued}); try again later."
+            )
+
+        agent, make_inputs = self.agents[agent_name]
+        config = traced({
+            "configurable": {"thread_id": thread_id},
+            "max_concurrency": agent_4_langgraph.MAX_CONCURRENCY,
+        })
+
+        key = (agent_name, thread_id)
+        entry = self._sessions.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        self._queued += 1
+        admitted = False
+        try:
+            async with entry[0]:          # One turn per session at a time
+                async with self._slots:   # Global admission limit
+                    self._queued -= 1
+                    admitted = True
+                    async for chunk in agent.astream(make_inputs(request), config, stream_mode="updates"):
+                        yield chunk
+        finally:
+            if not admitted:
+                self._queued -= 1
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._sessions[key]  # Drop idle session locks; history stays in the checkpointer
+
+    async def ask(self, agent_name: str, thread_id: str, request: str) -> str:
+        """Run one turn and return the last message produced."""
+        last = None
+        async for chunk in self.astream(agent_name, thread_id, request):
+            for update in chunk.values():
+                if update and update.get("messages"):
+                    last = update["messages"][-1]
+        return last.content if last is not None else ""
+
+
+async def main():
+    runner = SessionRunner()
+
+    # Several users hitting different agents at the same time, each on their own thread
+    sessions = [
+        ("basic", "user-1", "What is the correct roadmap to learn PostgreSQL?"),
+        ("multitool", "user-2", "If revenue is $500k and cost is $350k, what's the profit?"),
+        ("memory", "user-3", "What is LangGraph? Search if needed."),
+        ("memory", "user-4", "What is LangChain? Search if needed."),
+        ("langgraph", "user-5", "Research LangGraph, calculate profit for $1M rev/$700k cost, then summarize."),
+    ]
+
+    async def run(agent_name, thread_id, request):
+        t0 = time.perf_counter()
+        try:
+            answer = await runner.ask(agent_name, thread_id, request)
+        except RunnerAtCapacity as e:
+            answer = f"REJECTED: {e}"
+        print(f"--- [{agent_name}/{thread_id}] {time.perf_counter() - t0:.2f}s ---")
+        print(answer)
+        print()
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(run(*s) for s in sessions))
+    print(f"Served {len(sessions)} sessions in {time.perf_counter() - t_start:.2f}s "
+          f"(max_active={runner.max_active}, max_queued={runner.max_queued})")
+    print_trace_summary()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+import os
+import sys
+import asyncio
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import pytest
+from langchain.agents import create_agent
+from fakes import ScriptedChatModel
+from model_router import ModelRouter
+
+
+class FailingChatModel(ScriptedChatModel):
+    def _generate(self, *args, **kwargs):
+        raise RuntimeError("model down")
+
+    async def _agenerate(self, *args, **kwargs):
+        raise RuntimeError("model down")
+
+
+def run(router, request="hi", use_async=False):
+    agent = create_agent(model=router.large, tools=[], middleware=[router.middleware()])
+    inputs = {"messages": [("user", request)]}
+    result = asyncio.run(agent.ainvoke(inputs)) if use_async else agent.invoke(inputs)
+    return result["messages"][-1].content
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+class TestModelRouter:
+    """Test cases for routing, escalation and per-route stats (sync and async agent loops)"""
+
+    def test_simple_request_stays_on_fast_model(self, use_async):
+        router = ModelRouter(large=ScriptedChatModel(script=[{"content": "large"}]),
+                             fast=ScriptedChatModel(script=[{"content": "fast"}]))
+
+        assert run(router, use_async=use_async) == "fast"
+        assert router.stats["fast"]["calls"] == 1
+        assert router.stats["large"]["calls"] == 0
+
+    def test_hard_request_goes_to_large_model(self, use_async):
+        router = ModelRouter(large=ScriptedChatModel(script=[{"content": "large"}]),
+                             fast=ScriptedChatModel(script=[{"content": "fast"}]))
+
+        assert run(router, "Explain the design", use_async=use_async) == "large"
+        assert router.stats["fast"]["calls"] == 0
+
+    @pytest.mark.parametrize("fast", [ScriptedChatModel(script=[{"content": ""}]), FailingChatModel()])
+    def test_fast_failure_escalates(self, use_async, fast):
+        router = ModelRouter(large=ScriptedChatModel(script=[{"content": "large"}]), fast=fast)
+
+        assert run(router, use_async=use_async) == "large"
+        assert router.stats["fast"] == {**router.stats["fast"], "calls": 1, "failures": 1, "escalations": 1}
+        assert router.stats["large"]["calls"] == 1
+
+    def test_large_failure_is_recorded(self, use_async):
+        router = ModelRouter(large=FailingChatModel(), fast=FailingChatModel())
+
+        with pytest.raises(RuntimeError):
+            run(router, use_async=use_async)
+        assert router.stats["fast"]["failures"] == 1
+        assert router.stats["large"]["calls"] == 1
+        assert router.stats["large"]["failures"] == 1
+        assert router.report().splitlines()[2].split()[3] == "-"
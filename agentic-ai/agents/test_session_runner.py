@@ -0,0 +1,112 @@
+import os
+import sys
+import asyncio
+from collections import defaultdict
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-test")  # Agents build ChatOpenAI clients on import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import pytest
+from langchain.agents import create_agent
+from langgraph.checkpoint.memory import MemorySaver
+from fakes import ScriptedChatModel
+from session_runner import SessionRunner, RunnerAtCapacity, chat_inputs
+
+
+class RecordingAgent:
+    """Wraps a create_agent graph and records how many turns stream at once, overall and per thread."""
+
+    def __init__(self, latency=0.05):
+        self.agent = create_agent(
+            model=ScriptedChatModel(script=[{"content": "done"}], latency=latency),
+            tools=[],
+            checkpointer=MemorySaver(),
+        )
+        self.active = 0
+        self.max_active = 0
+        self.per_thread = defaultdict(int)
+        self.max_per_thread = defaultdict(int)
+
+    async def astream(self, inputs, config, **kwargs):
+        thread_id = config["configurable"]["thread_id"]
+        self.active += 1
+        self.per_thread[thread_id] += 1
+        self.max_active = max(self.max_active, self.active)
+        self.max_per_thread[thread_id] = max(self.max_per_thread[thread_id], self.per_thread[thread_id])
+        try:
+            async for chunk in self.agent.astream(inputs, config, **kwargs):
+                yield chunk
+        finally:
+            self.active -= 1
+            self.per_thread[thread_id] -= 1
+
+
+def run_turns(runner, turns):
+    """Start every (thread_id, request) turn at once; return the answers, with None for rejected turns."""
+    async def one(thread_id, request):
+        try:
+            return await runner.ask("fake", thread_id, request)
+        except RunnerAtCapacity:
+            return None
+
+    async def main():
+        return await asyncio.gather(*(one(*turn) for turn in turns))
+
+    return asyncio.run(main())
+
+
+class TestSessionRunner:
+    """Test cases for SessionRunner admission control and per-session ordering"""
+
+    def make_runner(self, agent):
+        return SessionRunner(agents={"fake": (agent, chat_inputs)}, max_active=2, max_queued=3)
+
+    def test_many_sessions_admission(self):
+        """2 turns run, 3 wait for a slot, the 6th is rejected"""
+        agent = RecordingAgent()
+        runner = self.make_runner(agent)
+
+        answers = run_turns(runner, [(f"user-{i}", "hi") for i in range(6)])
+
+        assert answers.count("done") == 5
+        assert answers.count(None) == 1
+        assert agent.max_active == 2
+        assert runner.queued == 0
+        assert runner._sessions == {}
+
+    def test_one_session_runs_turns_one_at_a_time(self):
+        """Turns queued behind their own session count against max_queued"""
+        agent = RecordingAgent()
+        runner = self.make_runner(agent)
+
+        answers = run_turns(runner, [("user-1", f"turn {i}") for i in range(5)])
+
+        assert answers.count("done") == 4
+        assert answers.count(None) == 1
+        assert agent.max_per_thread["user-1"] == 1
+        assert runner.queued == 0
+        assert runner._sessions == {}
+
+    def test_mixed_sessions(self):
+        """A busy session does not block other sessions from using free slots"""
+        agent = RecordingAgent()
+        runner = self.make_runner(agent)
+
+        turns = [("user-1", "a"), ("user-1", "b"), ("user-2", "c"), ("user-1", "d")]
+        answers = run_turns(runner, turns)
+
+        assert answers == ["done"] * 4
+        assert agent.max_active == 2
+        assert agent.max_per_thread["user-1"] == 1
+        assert runner.queued == 0
+        assert runner._sessions == {}
+
+    def test_unknown_agent(self):
+        """Unknown agent names are rejected before anything is queued"""
+        runner = self.make_runner(RecordingAgent())
+
+        with pytest.raises(KeyError):
+            asyncio.run(runner.ask("missing", "user-1", "hi"))
+
+        assert runner.queued == 0
+        assert runner._sessions == {}
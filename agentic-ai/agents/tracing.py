@@ -0,0 +1,168 @@
+# file: tracing.py
+# Structured per-step tracing for all agents, built on LangChain callbacks.
+#
+# Enable with AGENT_TRACE=1. Every model call and tool call becomes one JSON span,
+# appended to <AGENT_TRACE_DIR>/<thread_id>.jsonl:
+#   model spans: model name, graph node, latency, prompt/completion tokens
+#   tool spans : tool name, graph node, duration, cache hit (when the tool reports one), error
+# print_trace_summary() prints per-model / per-tool totals and writes summary.json.
+#
+# When AGENT_TRACE is unset, traced() returns the config untouched, so no handler is
+# attached and LangChain skips callback dispatch entirely.
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+
+load_dotenv()
+
+TRACING_ENABLED = os.getenv("AGENT_TRACE", "").lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv("AGENT_TRACE_DIR", "traces")
+
+
+class TraceHandler(BaseCallbackHandler):
+    # Not run_inline: each span appends to a file, so in async runs LangChain calls this
+    # sync handler in its executor instead of blocking the event loop.
+
+    def __init__(self, trace_dir=TRACE_DIR):
+        self.trace_dir = trace_dir
+        self._open = {}    # run_id -> span being measured
+        self._lock = threading.Lock()  # Spans finish on executor / worker threads
+        self.models = defaultdict(lambda: {"calls": 0, "errors": 0, "latency_s": 0.0,
+                                           "input_tokens": 0, "output_tokens": 0})
+        self.tools = defaultdict(lambda: {"calls": 0, "errors": 0, "latency_s": 0.0,
+                                          "cache_hits": 0})
+        self.threads = defaultdict(int)  # thread_id -> spans written
+
+    # --- span lifecycle ---
+    def _start(self, run_id, parent_run_id, kind, name, metadata):
+        metadata = metadata or {}
+        self._open[run_id] = {
+            "thread_id": str(metadata.get("thread_id", "no-thread")),
+            "kind": kind,
+            "name": name,
+            "node": metadata.get("langgraph_node"),
+            "run_id": str(run_id),
+            "parent_run_id": str(parent_run_id) if parent_run_id else None,
+            "start": time.time(),
+            "_t0": time.perf_counter(),
+        }
+
+    def _finish(self, run_id, **fields):
+        span = self._open.pop(run_id, None)
+        if span is None:
+            return None
+        span["duration_ms"] = (time.perf_counter() - span.pop("_t0")) * 1000
+        span.update(fields)
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in span["thread_id"])
+        line = json.dumps(span) + "\n"
+        with self._lock:
+            # Open per span: a long-lived runner serves unbounded threads, so no handles are kept
+            os.makedirs(self.trace_dir, exist_ok=True)
+            with open(os.path.join(self.trace_dir, f"{safe}.jsonl"), "a", encoding="utf-8") as f:
+                f.write(line)
+            self.threads[span["thread_id"]] += 1
+        return span
+
+    # --- model calls ---
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name", "model")
+        self._start(run_id, parent_run_id, "model", name, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name", "llm")
+        self._start(run_id, parent_run_id, "model", name, metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = {}
+        try:
+            usage = response.generations[0][0].message.usage_metadata or {}
+        except (IndexError, AttributeError):
+            pass
+        if not usage:  # Older providers only fill llm_output
+            token_usage = (response.llm_output or {}).get("token_usage", {})
+            usage = {"input_tokens": token_usage.get("prompt_tokens", 0),
+                     "output_tokens": token_usage.get("completion_tokens", 0)}
+        span = self._finish(run_id,
+                            input_tokens=usage.get("input_tokens", 0),
+                            output_tokens=usage.get("output_tokens", 0))
+        if span:
+            with self._lock:
+                s = self.models[span["name"]]
+                s["calls"] += 1
+                s["latency_s"] += span["duration_ms"] / 1000
+                s["input_tokens"] += span["input_tokens"]
+                s["output_tokens"] += span["output_tokens"]
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        span = self._finish(run_id, error=f"{type(error).__name__}: {error}")
+        if span:
+            with self._lock:
+                self.models[span["name"]]["errors"] += 1
+
+    # --- tool calls ---
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self._start(run_id, parent_run_id, "tool", (serialized or {}).get("name", "tool"), metadata)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        # Tools report cache hits via a {"cache_hit": ...} artifact; None means "not reported"
+        artifact = getattr(output, "artifact", None)
+        cache_hit = artifact.get("cache_hit") if isinstance(artifact, dict) else None
+        span = self._finish(run_id, cache_hit=cache_hit)
+        if span:
+            with self._lock:
+                s = self.tools[span["name"]]
+                s["calls"] += 1
+                s["latency_s"] += span["duration_ms"] / 1000
+                s["cache_hits"] += 1 if cache_hit else 0
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        span = self._finish(run_id, error=f"{type(error).__name__}: {error}")
+        if span:
+            with self._lock:
+                self.tools[span["name"]]["errors"] += 1
+
+    # --- aggregation ---
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "models": {k: dict(v) for k, v in self.models.items()},
+                "tools": {k: dict(v) for k, v in self.tools.items()},
+                "spans_per_thread": dict(self.threads),
+            }
+
+
+tracer = TraceHandler() if TRACING_ENABLED else None
+
+
+def traced(config=None):
+    """Return `config` with the tracer added to its callbacks (unchanged when tracing is off)."""
+    config = dict(config or {})
+    if tracer is not None:
+        config["callbacks"] = [*config.get("callbacks", []), tracer]
+    return config
+
+
+def print_trace_summary(handler=None):
+    """Print per-model / per-tool totals of `handler` (default: the AGENT_TRACE tracer)."""
+    handler = handler or tracer
+    if handler is None:
+        return
+    summary = handler.summary()
+    print("\n=== Trace summary ===")
+    for name, s in summary["models"].items():
+        avg = s["latency_s"] / s["calls"] if s["calls"] else 0.0
+        print(f"[model] {name}: {s['calls']} calls, {s['errors']} errors, avg {avg:.2f}s, "
+              f"tokens in/out {s['input_tokens']}/{s['output_tokens']}")
+    for name, s in summary["tools"].items():
+        avg = s["latency_s"] / s["calls"] if s["calls"] else 0.0
+        print(f"[tool]  {name}: {s['calls']} calls, {s['errors']} errors, avg {avg:.2f}s, "
+              f"cache hits {s['cache_hits']}")
+    os.makedirs(handler.trace_dir, exist_ok=True)
+    path = os.path.join(handler.trace_dir, "summary.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Spans written to {handler.trace_dir}/ for threads: {', '.join(summary['spans_per_thread'])}")
@@ -0,0 +1,204 @@
+# file: bench_agents.py
+# Offline benchmark for the agent pipelines: no API key, network or live services needed.
+#
+# Runs the real create_agent loop (agent_2 shape) and the compiled agent_4 LangGraph workflow
+# with ScriptedChatModel and stub tools (see fakes.py), and reports:
+#   1. per-step time and total run time for a single turn
+#   2. memory growth over many turns on one checkpointed thread
+#   3. throughput with many concurrent sessions
+# With the default zero model/tool latency every number is framework + checkpointer overhead,
+# so results can be compared between langchain/langgraph releases.
+#
+# Usage (from agentic-ai/):
+#   python benchmarks/bench_agents.py
+#   python benchmarks/bench_agents.py --pipeline langgraph --sessions 50 --tool-latency 0.05
+#   python benchmarks/bench_agents.py --script recorded.json --json results.json
+#   python benchmarks/bench_agents.py --trace traces/bench     # Same runs with span tracing attached
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+from collections import defaultdict
+from importlib.metadata import version
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")  # ChatOpenAI refuses to build without one
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+
+from langchain.agents import create_agent
+from langgraph.checkpoint.memory import MemorySaver
+from fakes import DEFAULT_SCRIPT, ScriptedChatModel, load_script, make_stub_tools, make_stub_search
+from tracing import TraceHandler, print_trace_summary
+
+
+def build_pipeline(name, args):
+    """Return (runnable, make_inputs) for a pipeline with a fresh checkpointer."""
+    checkpointer = MemorySaver() if args.checkpointer == "memory" else None
+    if name == "create_agent":
+        model = ScriptedChatModel(script=args.script, latency=args.model_latency)
+        agent = create_agent(
+            model=model,
+            tools=make_stub_tools(args.tool_latency),
+            system_prompt="You have access to search, calculator, weather, and stock market tools.",
+            checkpointer=checkpointer,
+        )
+        return agent, lambda request: {"messages": [("user", request)]}
+
+    import agent_4_langgraph
+    agent_4_langgraph.search = make_stub_search(args.tool_latency)  # Researcher calls this global
+    return agent_4_langgraph.workflow.compile(checkpointer=checkpointer), agent_4_langgraph.make_inputs
+
+
+def run_config(thread_id, args):
+    config = {"configurable": {"thread_id": thread_id}, "max_concurrency": 4}
+    if args.tracer:
+        config["callbacks"] = [args.tracer]
+    return config
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+# --- 1. Single turn: per-step and total time ---
+def bench_steps(name, args):
+    app, make_inputs = build_pipeline(name, args)
+    step_times = defaultdict(float)  # node -> wall time summed over all runs
+    totals = []
+    for run in range(args.runs):
+        t_start = t_prev = time.perf_counter()
+        for chunk in app.stream(make_inputs("benchmark request"), run_config(f"steps-{run}", args), stream_mode="updates"):
+            now = time.perf_counter()
+            for node, update in chunk.items():
+                if name == "create_agent":
+                    step_times[node] += now - t_prev  # Nodes run one at a time: time since the previous update
+                elif update and "step_timings" in update:
+                    # Parallel specialists stream back to back, so use the time each one measured itself.
+                    # Supervisor passes only route and are left to the total.
+                    step_times[node] += update["step_timings"][node]
+            t_prev = now
+        totals.append(time.perf_counter() - t_start)
+    return {
+        "runs": args.runs,
+        "total_ms": {"mean": statistics.mean(totals) * 1000, "p95": percentile(totals, 95) * 1000},
+        "steps_ms_per_run": {node: t / args.runs * 1000 for node, t in step_times.items()},
+    }
+
+
+# --- 2. Memory growth over many turns on one thread ---
+def bench_memory(name, args):
+    app, make_inputs = build_pipeline(name, args)
+    config = run_config("memory-thread", args)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    samples = []
+    every = max(1, args.turns // 10)
+    for turn in range(1, args.turns + 1):
+        for _ in app.stream(make_inputs(f"turn {turn}"), config, stream_mode="updates"):
+            pass
+        if turn % every == 0:
+            samples.append((turn, (tracemalloc.get_traced_memory()[0] - base) / 1024))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    growth = samples[-1][1] if samples else 0.0
+    return {
+        "turns": args.turns,
+        "growth_kb": growth,
+        "growth_kb_per_turn": growth / args.turns,
+        "peak_kb": (peak - base) / 1024,
+        "samples": samples,
+    }
+
+
+# --- 3. Throughput with concurrent sessions ---
+async def _bench_throughput(name, args):
+    app, make_inputs = build_pipeline(name, args)
+    latencies = []
+
+    async def session(i):
+        for turn in range(args.session_turns):
+            t0 = time.perf_counter()
+            async for _ in app.astream(make_inputs(f"turn {turn}"), run_config(f"session-{i}", args), stream_mode="updates"):
+                pass
+            latencies.append(time.perf_counter() - t0)
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - t_start
+    return {
+        "sessions": args.sessions,
+        "turns": len(latencies),
+        "elapsed_s": elapsed,
+        "turns_per_s": len(latencies) / elapsed,
+        "turn_ms": {"p50": percentile(latencies, 50) * 1000, "p95": percentile(latencies, 95) * 1000},
+    }
+
+
+def bench_throughput(name, args):
+    return asyncio.run(_bench_throughput(name, args))
+
+
+def print_report(name, result):
+    steps, mem, thr = result["steps"], result["memory"], result["throughput"]
+    print(f"=== {name} (checkpointer={result['checkpointer']}) ===")
+    print(f"Single turn : {steps['total_ms']['mean']:.2f} ms mean, {steps['total_ms']['p95']:.2f} ms p95 over {steps['runs']} runs")
+    for node, ms in steps["steps_ms_per_run"].items():
+        print(f"  step {node:<12} {ms:8.3f} ms")
+    print(f"Memory      : +{mem['growth_kb']:.1f} KB after {mem['turns']} turns "
+          f"({mem['growth_kb_per_turn']:.2f} KB/turn, peak +{mem['peak_kb']:.1f} KB)")
+    print(f"Throughput  : {thr['turns_per_s']:.1f} turns/s with {thr['sessions']} sessions "
+          f"(p50 {thr['turn_ms']['p50']:.2f} ms, p95 {thr['turn_ms']['p95']:.2f} ms)")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline agent benchmark (scripted model, stub tools).")
+    parser.add_argument("--pipeline", choices=["create_agent", "langgraph", "all"], default="all")
+    parser.add_argument("--checkpointer", choices=["memory", "none"], default="memory")
+    parser.add_argument("--runs", type=int, default=50, help="Single-turn runs for per-step timing")
+    parser.add_argument("--turns", type=int, default=200, help="Turns on one thread for memory growth")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent sessions for throughput")
+    parser.add_argument("--session-turns", type=int, default=5, help="Turns per concurrent session")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Simulated seconds per model call")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Simulated seconds per tool call")
+    parser.add_argument("--script", help="JSON file of recorded model steps (default: built-in script)")
+    parser.add_argument("--trace", metavar="DIR", help="Attach the span tracer, writing JSONL to DIR (measures tracing overhead)")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+    args.script = load_script(args.script) if args.script else DEFAULT_SCRIPT
+    args.tracer = TraceHandler(trace_dir=args.trace) if args.trace else None
+
+    pipelines = ["create_agent", "langgraph"] if args.pipeline == "all" else [args.pipeline]
+    results = {
+        "versions": {pkg: version(pkg) for pkg in ("langchain", "langchain-core", "langgraph")},
+        "settings": {k: v for k, v in vars(args).items() if k not in ("script", "json", "tracer")},
+        "pipelines": {},
+    }
+    print(f"Versions: {results['versions']}\n")
+    for name in pipelines:
+        result = {
+            "checkpointer": args.checkpointer,
+            "steps": bench_steps(name, args),
+            "memory": bench_memory(name, args),
+            "throughput": bench_throughput(name, args),
+        }
+        results["pipelines"][name] = result
+        print_report(name, result)
+
+    if args.tracer:
+        results["trace"] = args.tracer.summary()
+        print_trace_summary(args.tracer)  # Also writes summary.json next to the spans
+        print()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print("Results written to", args.json)
+
+
+if __name__ == "__main__":
+    main()
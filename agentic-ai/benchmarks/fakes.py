@@ -0,0 +1,127 @@
+# file: fakes.py
+# Offline stand-ins for the live services used by the agents:
+#   - ScriptedChatModel replays scripted/recorded model turns, including tool calls
+#   - make_stub_tools() mirrors agent_2's tools with a configurable sleep instead of network I/O
+import json
+import time
+import uuid
+import asyncio
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+# Default script, shaped like agent_2: one step calling two tools in parallel, then a final answer
+DEFAULT_SCRIPT = [
+    {
+        "content": "",
+        "tool_calls": [
+            {"name": "calculate_profit", "args": {"revenue": 500000, "cost": 350000}},
+            {"name": "get_weather", "args": {"location": "Bangalore"}},
+        ],
+    },
+    {"content": "Profit is $150,000. Weather in Bangalore: Partly cloudy, 27°C."},
+]
+
+
+def load_script(path):
+    """Load a recorded script: a JSON list of {"content": ..., "tool_calls": [...]} steps."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that answers from a fixed script instead of calling an LLM.
+
+    The step played is the number of AI messages since the last user message, so every
+    session/thread walks through the script independently and concurrent runs stay deterministic.
+    Once the script is exhausted the last step is repeated.
+    """
+
+    script: list = DEFAULT_SCRIPT
+    latency: float = 0.0  # Simulated model latency in seconds
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self  # Tool calls come from the script
+
+    def _next_message(self, messages):
+        step = 0
+        for m in reversed(messages):
+            if isinstance(m, HumanMessage):
+                break
+            if isinstance(m, AIMessage):
+                step += 1
+        entry = self.script[min(step, len(self.script) - 1)]
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        content = entry.get("content", "")
+        return AIMessage(
+            content=content,
+            tool_calls=[
+                {"name": c["name"], "args": c["args"], "id": f"call_{uuid.uuid4().hex[:12]}"}
+                for c in entry.get("tool_calls", [])
+            ],
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+
+def _stub(name, description, func, latency):
+    def run(*args, **kwargs):
+        if latency:
+            time.sleep(latency)
+        return func(*args, **kwargs)
+
+    async def arun(*args, **kwargs):
+        if latency:
+            await asyncio.sleep(latency)
+        return func(*args, **kwargs)
+
+    schema = StructuredTool.from_function(func, name=name, description=description).args_schema
+    return StructuredTool.from_function(
+        func=run, coroutine=arun, name=name, description=description, args_schema=schema
+    )
+
+
+def _search(query: str) -> str:
+    return f"Stub search results for '{query}': LangGraph is a framework for stateful agents."
+
+def _calculate_profit(revenue: float, cost: float) -> float:
+    return revenue - cost
+
+def _get_weather(location: str) -> str:
+    return f"Weather in {location}: Partly cloudy. Temperature: 27°C."
+
+def _get_stock_info(symbol: str) -> str:
+    return f"{symbol} | Current Price : 1234.50 | Change: +5.20 (+0.42%)"
+
+
+def make_stub_tools(latency=0.0):
+    """Local versions of agent_2's search, calculator, weather and stock tools."""
+    return [
+        _stub("duckduckgo_results_json", "Search the web.", _search, latency),
+        _stub("calculate_profit", "Calculate profit from revenue and cost.", _calculate_profit, latency),
+        _stub("get_weather", "Get weather for a location.", _get_weather, latency),
+        _stub("get_stock_info", "Get stock market data for a symbol.", _get_stock_info, latency),
+    ]
+
+
+def make_stub_search(latency=0.0):
+    """Stand-in for DuckDuckGoSearchRun used by agent_4's researcher."""
+    return _stub("duckduckgo_search", "Search the web.", _search, latency)
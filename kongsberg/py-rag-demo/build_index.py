@@ -1,5 +1,10 @@
 # file: build_index.py
 import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from langchain_openai import OpenAIEmbeddings
@@ -8,42 +13,202 @@ from langchain_chroma import Chroma
 #from langchain.textsplitters import RecursiveCharacterTextSplitter
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
+from corpus import normalize_source
+from shards import load_manifest, save_manifest, shard_dirs, shard_for_chunk
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
 
-# 1. Your corpus (replace with file loaders in your training later)
+PERSIST_DIR = "./chroma-store"
+SUPPORTED_TYPES = {".pdf": "pdf", ".txt": "text", ".md": "markdown"}
+BATCH_SIZE = 500  # Chunks per upsert; Chroma rejects very large batches
+
+# 1. Your corpus: these inline notes, or files/folders passed on the command line
 raw_docs = [
     "Agentic AI systems can autonomously decide which tools to call.",
     "RAG combines retrieval from a vector store with generation from an LLM.",
     "Chroma is an open‑source vector database optimized for AI applications.",
 ]
 
-# 2. Split into chunks
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=400,
-    chunk_overlap=50,
-)
-docs = text_splitter.split_documents(
-    [Document(page_content=t) for t in raw_docs]
-)
-
-# 3. Embeddings
-embeddings = OpenAIEmbeddings(
-    model="text-embedding-3-large",
-    api_key=OPENAI_API_KEY,
-    base_url=OPENAI_API_BASE,
-)
-
-# 4. Create / persist Chroma store
-PERSIST_DIR = "./chroma-store"
 
-vectorstore = Chroma.from_documents(
-    documents=docs,
-    embedding=embeddings,
-    persist_directory=PERSIST_DIR,
-)
+def iter_files(paths):
+    for p in map(Path, paths):
+        if p.is_dir():
+            yield from sorted(f for f in p.rglob("*") if f.suffix.lower() in SUPPORTED_TYPES)
+        elif p.suffix.lower() in SUPPORTED_TYPES:
+            yield p
+        else:
+            print(f"Skipping unsupported file: {p}")
+
+
+def load_corpus(paths, ingested_at):
+    """Return one Document per page (PDF) or per file, with metadata used for filtered retrieval.
+
+    Metadata values are scalars so Chroma can filter on them:
+      source      - normalized file path (or "inline") page - 1-based page number
+      doc_type    - pdf / text / markdown / note ingested_at - unix time of this indexing run
+      modified_at - unix time the file was last modified (used for "docs after date X")
+    """
+    if not paths:
+        return [
+            Document(page_content=t, metadata={
+                "source": "inline", "page": i + 1, "doc_type": "note",
+                "ingested_at": ingested_at, "modified_at": ingested_at,
+            })
+            for i, t in enumerate(raw_docs)
+        ]
+
+    docs = []
+    for path in iter_files(paths):
+        base = {
+            "source": normalize_source(path),
+            "doc_type": SUPPORTED_TYPES[path.suffix.lower()],
+            "ingested_at": ingested_at,
+            "modified_at": int(path.stat().st_mtime),
+        }
+        if base["doc_type"] == "pdf":
+            from pypdf import PdfReader  # Only needed when indexing PDFs
+            for page_no, page in enumerate(PdfReader(path).pages, start=1):
+                text = page.extract_text() or ""
+                if text.strip():
+                    docs.append(Document(page_content=text, metadata={**base, "page": page_no}))
+        else:
+            docs.append(Document(page_content=path.read_text(encoding="utf-8"), metadata={**base, "page": 1}))
+    return docs
+
+
+def chunk_ids(chunks):
+    """Stable ids (source:page:n) so re-indexing a file overwrites its chunks instead of duplicating them."""
+    counters = {}
+    ids = []
+    for c in chunks:
+        key = (c.metadata["source"], c.metadata["page"])
+        counters[key] = counters.get(key, 0) + 1
+        c.metadata["chunk"] = counters[key]
+        ids.append(f"{key[0]}:{key[1]}:{counters[key]}")
+    return ids
+
+
+def index_into(persist_dir, docs, ids, embeddings, sources):
+    """Upsert chunks into one Chroma store, first removing older chunks of the same sources."""
+    vectorstore = Chroma(
+        persist_directory=persist_dir,
+        embedding_function=embeddings,
+    )
+
+    # Replace earlier chunks of the same sources (a file may now have fewer chunks than before)
+    for source in sources:
+        stale = vectorstore.get(where={"source": source}, include=[])["ids"]
+        if stale:
+            vectorstore.delete(ids=stale)
+
+    for i in range(0, len(docs), BATCH_SIZE):
+        vectorstore.add_documents(docs[i:i + BATCH_SIZE], ids=ids[i:i + BATCH_SIZE])
+    return len(docs)
+
+
+def stored_sources(persist_dir):
+    """Distinct `source` values already indexed in one Chroma store."""
+    if not os.path.exists(persist_dir):
+        return set()
+    metadatas = Chroma(persist_directory=persist_dir).get(include=["metadatas"])["metadatas"]
+    return {m["source"] for m in metadatas}
+
+
+def resolve_manifest(args):
+    """Sharding settings: reuse the existing manifest, or create one when --shards > 1."""
+    manifest = load_manifest(PERSIST_DIR)
+    if manifest:
+        if (args.shards not in (None, manifest["count"])) or (args.shard_by not in (None, manifest["shard_by"])):
+            sys.exit(f"{PERSIST_DIR} already has {manifest['count']} shards by {manifest['shard_by']}; "
+                     f"delete it to re-shard.")
+        return manifest
+    if (args.shards or 1) <= 1:
+        return None
+    if os.path.exists(os.path.join(PERSIST_DIR, "chroma.sqlite3")):
+        sys.exit(f"{PERSIST_DIR} holds an unsharded index; delete it before building shards.")
+    return save_manifest(PERSIST_DIR, args.shard_by or "hash", args.shards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Chroma index with per-chunk metadata.")
+    parser.add_argument("paths", nargs="*", help="Files or folders to index (.pdf, .txt, .md). Default: inline notes.")
+    parser.add_argument("--shards", type=int, help="Split the index into N shard stores (default: 1, or the existing layout)")
+    parser.add_argument("--shard-by", choices=["hash", "source"], help="hash: spread chunks evenly; source: keep each document in one shard")
+    parser.add_argument("--rebuild-shard", type=int, metavar="K", help="Wipe shard K and re-index only its chunks from PATHS")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Shards ingested in parallel")
+    args = parser.parse_args()
+
+    manifest = resolve_manifest(args)
+    if args.rebuild_shard is not None:
+        if not manifest:
+            sys.exit("--rebuild-shard needs a sharded index (build with --shards N first).")
+        if not args.paths:
+            # Without PATHS load_corpus() falls back to the inline notes, which would replace the shard
+            sys.exit("--rebuild-shard needs the PATHS whose chunks belong in that shard.")
+        if not 0 <= args.rebuild_shard < manifest["count"]:
+            sys.exit(f"--rebuild-shard must be between 0 and {manifest['count'] - 1}.")
+
+    ingested_at = int(time.time())
+    pages = load_corpus(args.paths, ingested_at)
+    if not pages:
+        sys.exit("Nothing to index.")
+
+    # 2. Split into chunks (metadata is copied onto every chunk)
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=400,
+        chunk_overlap=50,
+    )
+    docs = text_splitter.split_documents(pages)
+    ids = chunk_ids(docs)
+    sources = sorted({d.metadata["source"] for d in docs})
+
+    # 3. Embeddings
+    embeddings = OpenAIEmbeddings(
+        model="text-embedding-3-large",
+        api_key=OPENAI_API_KEY,
+        base_url=OPENAI_API_BASE,
+    )
+
+    # 4. Create / persist Chroma store(s)
+    if not manifest:
+        count = index_into(PERSIST_DIR, docs, ids, embeddings, sources)
+        print(f"Indexed {count} chunks from {len(sources)} source(s) into {PERSIST_DIR}")
+        return
+
+    dirs = shard_dirs(PERSIST_DIR, manifest)
+    groups = [([], []) for _ in dirs]
+    for doc, chunk_id in zip(docs, ids):
+        shard_docs, shard_ids = groups[shard_for_chunk(chunk_id, doc.metadata["source"], manifest)]
+        shard_docs.append(doc)
+        shard_ids.append(chunk_id)
+
+    targets = range(len(dirs))
+    if args.rebuild_shard is not None:
+        if not groups[args.rebuild_shard][0]:
+            sys.exit(f"None of the given paths have chunks in {manifest['shards'][args.rebuild_shard]}; "
+                     f"leaving it untouched.")
+        # PATHS must cover every document in the shard, otherwise wiping it would lose the rest
+        missing = sorted(stored_sources(dirs[args.rebuild_shard]) - set(sources))
+        if missing:
+            sys.exit(f"{manifest['shards'][args.rebuild_shard]} also holds chunks of {len(missing)} source(s) "
+                     f"not in the given paths; add them to rebuild it:\n  " + "\n  ".join(missing))
+        targets = [args.rebuild_shard]
+        # Drop the collection through Chroma rather than deleting the folder: Chroma caches one
+        # client per path, and the stored_sources() client above would otherwise write to a deleted db
+        Chroma(persist_directory=dirs[args.rebuild_shard]).delete_collection()
+
+    # Each shard is its own persist directory, so shards embed and write concurrently.
+    # Every shard gets the stale-chunk cleanup, since a source's old chunks may live in any shard.
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {k: pool.submit(index_into, dirs[k], *groups[k], embeddings, sources) for k in targets}
+        counts = {k: f.result() for k, f in futures.items()}
+    for k, count in counts.items():
+        print(f"  {manifest['shards'][k]}: {count} chunks")
+    print(f"Indexed {sum(counts.values())} chunks from {len(sources)} source(s) into {len(counts)} shard(s) "
+          f"under {PERSIST_DIR} (by {manifest['shard_by']})")
 
-print("Chroma index built at", PERSIST_DIR)
+if __name__ == "__main__":
+    main()
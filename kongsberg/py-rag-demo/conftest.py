@@ -0,0 +1,49 @@
+import os
+import importlib
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-test")  # Clients are built on import; tests never call them
+
+
+@pytest.fixture(scope="session")
+def query_rag(tmp_path_factory):
+    """Import query_rag from an empty folder, so its module-level store is a throwaway ./chroma-store."""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("query-rag"))
+    try:
+        return importlib.import_module("query_rag")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Five text files that split into several chunks each."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(1, 6):
+        paragraphs = [f"Document {i}, part {p}: notes on topic {i * 10 + p}. " * 6 for p in range(3)]
+        (docs / f"d{i}.txt").write_text("\n\n".join(paragraphs), encoding="utf-8")
+    return docs
+
+
+@pytest.fixture
+def run_build(tmp_path, monkeypatch):
+    """Run build_index.py's main() in tmp_path with offline embeddings: run_build("docs", "--shards", "3").
+
+    Writes to tmp_path/<persist_dir> and returns that path. It is absolute on purpose: Chroma caches
+    clients by path string, so a relative "./chroma-store" would be shared between tests.
+    """
+    import sys
+    import build_index
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build_index, "OpenAIEmbeddings", lambda **kwargs: DeterministicFakeEmbedding(size=32))
+
+    def run(*argv, persist_dir="chroma-store"):
+        monkeypatch.setattr(build_index, "PERSIST_DIR", str(tmp_path / persist_dir))
+        monkeypatch.setattr(sys, "argv", ["build_index.py", *argv])
+        build_index.main()
+        return build_index.PERSIST_DIR
+    return run
@@ -0,0 +1,20 @@
+# file: corpus.py
+# Document naming shared by build_index.py and query_rag.py.
+#
+# Every chunk stores its document as `source`: the file path relative to CORPUS_ROOT,
+# so the same file gets the same source however its path is typed.
+import os
+from pathlib import Path
+
+CORPUS_ROOT = Path(__file__).resolve().parent  # Sources are stored relative to this folder
+
+
+def normalize_source(path) -> str:
+    """Canonical `source` value: the resolved path relative to CORPUS_ROOT, with forward slashes.
+
+    data/x.pdf, ../py-rag-demo/data/x.pdf and /abs/.../data/x.pdf all map to the same source,
+    so re-indexing replaces earlier chunks and --source filters match however the path is typed.
+    """
+    if path == "inline":
+        return path
+    return Path(os.path.relpath(Path(path).resolve(), CORPUS_ROOT)).as_posix()
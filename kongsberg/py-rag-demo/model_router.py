@@ -0,0 +1,92 @@
+# file: model_router.py
+# Routes each RAG question to a fast model or the large model.
+#
+# The decision looks at the user's question only (the prompt always carries the
+# retrieved context, so its length says little about difficulty). Short questions
+# without "hard" keywords go to FAST_MODEL; everything else, and any fast-model
+# failure or empty answer, goes to the large model. Per-route latency and token
+# counts are kept in `stats` so the thresholds can be tuned.
+import os
+import time
+from collections import defaultdict
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
+
+FAST_MODEL = os.getenv("FAST_MODEL", "gpt-4o-mini")
+ROUTER_MAX_FAST_CHARS = int(os.getenv("ROUTER_MAX_FAST_CHARS", "120"))
+ROUTER_ESCALATE_KEYWORDS = [
+    k.strip() for k in os.getenv(
+        "ROUTER_ESCALATE_KEYWORDS", "explain,compare,why,analyze,design,step-by-step"
+    ).split(",") if k.strip()
+]
+
+
+class ModelRouter:
+    def __init__(self, large, prompt, fast=None,
+                 max_fast_chars=ROUTER_MAX_FAST_CHARS,
+                 escalate_keywords=ROUTER_ESCALATE_KEYWORDS):
+        self.large = large
+        self.prompt = prompt
+        self.fast = fast or ChatOpenAI(
+            model=FAST_MODEL,
+            temperature=large.temperature,
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_API_BASE,
+        )
+        self.max_fast_chars = max_fast_chars
+        self.escalate_keywords = [k.lower() for k in escalate_keywords]
+        self.stats = defaultdict(lambda: {
+            "calls": 0, "failures": 0, "latency_s": 0.0,
+            "input_tokens": 0, "output_tokens": 0,
+        })
+
+    def pick(self, question: str) -> str:
+        q = question.lower()
+        if len(q) > self.max_fast_chars or any(k in q for k in self.escalate_keywords):
+            return "large"
+        return "fast"
+
+    def _call(self, route, messages):
+        s = self.stats[route]
+        s["calls"] += 1
+        t0 = time.perf_counter()
+        try:
+            message = (self.fast if route == "fast" else self.large).invoke(messages)
+        except Exception:
+            s["failures"] += 1
+            raise
+        finally:
+            s["latency_s"] += time.perf_counter() - t0
+        usage = message.usage_metadata or {}
+        s["input_tokens"] += usage.get("input_tokens", 0)
+        s["output_tokens"] += usage.get("output_tokens", 0)
+        return message
+
+    def invoke(self, inputs: dict):
+        """Chain step: takes {"context", "question"}, returns the model's AIMessage."""
+        messages = self.prompt.invoke(inputs)
+        if self.pick(inputs["question"]) == "fast":
+            try:
+                message = self._call("fast", messages)
+                if message.content:
+                    return message
+                self.stats["fast"]["failures"] += 1
+            except Exception as e:
+                print(f"[router] fast model failed ({type(e).__name__}), escalating")
+        return self._call("large", messages)
+
+    def report(self) -> str:
+        lines = []
+        for route in ("fast", "large"):
+            s = self.stats[route]
+            avg = s["latency_s"] / s["calls"] if s["calls"] else 0.0
+            lines.append(
+                f"[router] {route}: {s['calls']} calls, {s['failures']} failed, avg {avg:.2f}s, "
+                f"tokens in/out {s['input_tokens']}/{s['output_tokens']}"
+            )
+        return "\n".join(lines)
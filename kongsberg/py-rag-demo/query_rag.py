@@ -1,11 +1,18 @@
 # file: query_rag.py
 import os
+import heapq
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
+from model_router import ModelRouter
+from corpus import normalize_source
+from shards import load_manifest, shard_dirs, shard_index
 
 load_dotenv()
 
@@ -14,21 +21,67 @@ OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
 
 PERSIST_DIR = "./chroma-store"
 
-# 1. Re-load vector store
+# 1. Re-load vector store (one store, or every shard listed in chroma-store/shards.json)
 embeddings = OpenAIEmbeddings(
     model="text-embedding-3-large",
     api_key=OPENAI_API_KEY,
     base_url=OPENAI_API_BASE,
 )
 
-vectorstore = Chroma(
-    persist_directory=PERSIST_DIR,
-    embedding_function=embeddings,
-)
+manifest = load_manifest(PERSIST_DIR)
+shard_stores = [
+    Chroma(persist_directory=d, embedding_function=embeddings)
+    for d in (shard_dirs(PERSIST_DIR, manifest) if manifest else [PERSIST_DIR])
+]
+vectorstore = shard_stores[0] if not manifest else None
+shard_pool = ThreadPoolExecutor(max_workers=len(shard_stores)) if manifest else None
+
+TOP_K = 4
+
+
+def to_timestamp(value: str) -> int:
+    """Accept an ISO date/datetime (2026-02-01, 2026-02-01T09:30) and return unix time."""
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def build_filter(source=None, doc_type=None, after=None, before=None):
+    """Chroma `where` clause from the metadata written by build_index.py (None = whole collection).
 
-retriever = vectorstore.as_retriever(search_kwargs={"k": 4})
+    Chroma applies it before the vector search, so a query scoped to one document only
+    ranks that document's chunks no matter how large the collection grows.
+    """
+    clauses = []
+    if source:
+        clauses.append({"source": normalize_source(source)})
+    if doc_type:
+        clauses.append({"doc_type": doc_type})
+    if after:
+        clauses.append({"modified_at": {"$gte": to_timestamp(after)}})
+    if before:
+        clauses.append({"modified_at": {"$lt": to_timestamp(before)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
 
-# 2. LLM
+
+def retrieve(inputs: dict):
+    where = inputs.get("filter")
+    if not manifest:
+        return vectorstore.similarity_search(inputs["question"], k=TOP_K, filter=where)
+
+    # Scatter-gather: embed once, search shards in parallel, keep the global top-k by distance
+    stores = shard_stores
+    if manifest["shard_by"] == "source" and inputs.get("source"):
+        stores = [shard_stores[shard_index(inputs["source"], manifest["count"])]]  # Document lives in one shard
+    query_vector = embeddings.embed_query(inputs["question"])
+    per_shard = shard_pool.map(
+        lambda store: store.similarity_search_by_vector_with_relevance_scores(query_vector, k=TOP_K, filter=where),
+        stores,
+    )
+    best = heapq.nsmallest(TOP_K, (hit for hits in per_shard for hit in hits), key=lambda hit: hit[1])
+    return [doc for doc, _distance in best]
+
+# 2. LLM (large model; the router sends simple questions to FAST_MODEL instead)
 llm = ChatOpenAI(
     model="gpt-4o",
     # model="gpt-4o-mini",  # Use OpenRouter(https://openrouter.ai/api/v1) model format: provider/model (e.g., openai/gpt-4o-mini)
@@ -46,30 +99,44 @@ Question: {question}
 Answer the question clearly and concisely based on the context provided above."""
 
 prompt = ChatPromptTemplate.from_template(template)
+router = ModelRouter(large=llm, prompt=prompt)
 
 def format_docs(docs):
     return "\n\n".join(doc.page_content for doc in docs)
 
-# Create the RAG chain
+# Create the RAG chain: {"question", "filter", "source"} → same keys plus "docs" and "answer"
+# Retrieval runs once; the same docs feed the prompt and the sources list.
 rag_chain = (
-    {"context": retriever | format_docs, "question": RunnablePassthrough()}
-    | prompt
-    | llm
-    | StrOutputParser()
+    RunnablePassthrough.assign(docs=RunnableLambda(retrieve))
+    | RunnablePassthrough.assign(answer=(
+        {"context": lambda x: format_docs(x["docs"]), "question": lambda x: x["question"]}
+        | RunnableLambda(router.invoke)  # prompt → fast or large model
+        | StrOutputParser()
+    ))
 )
 
-def ask(query: str):
-    # Get the answer
-    answer = rag_chain.invoke(query)
-    
-    # Get source documents separately for display
-    source_docs = retriever.invoke(query)
+def ask(query: str, source=None, doc_type=None, after=None, before=None):
+    where = build_filter(source=source, doc_type=doc_type, after=after, before=before)
+    source = normalize_source(source) if source else None  # Shard routing uses the stored spelling
+    result = rag_chain.invoke({"question": query, "filter": where, "source": source})
     
     print("\nQ:", query)
-    print("\nA:", answer)
+    if where:
+        print("Filter:", where)
+    print("\nA:", result["answer"])
     print("\nSources:")
-    for i, doc in enumerate(source_docs, start=1):
-        print(f"- [{i}] {doc.page_content[:120]}...")
+    for i, doc in enumerate(result["docs"], start=1):
+        meta = doc.metadata
+        print(f"- [{i}] {meta.get('source', '?')} p.{meta.get('page', '?')}: {doc.page_content[:120]}...")
 
 if __name__ == "__main__":
-    ask("Explain RAG to a junior backend developer.")
+    parser = argparse.ArgumentParser(description="Ask the RAG index, optionally scoped by metadata.")
+    parser.add_argument("question", nargs="?", default="Explain RAG to a junior backend developer.")
+    parser.add_argument("--source", help="Only this document (any path to the indexed file, e.g. ../data/logiCoT-paper.pdf)")
+    parser.add_argument("--type", dest="doc_type", help="Only this document type: pdf, text, markdown, note")
+    parser.add_argument("--after", help="Only documents modified on/after this ISO date")
+    parser.add_argument("--before", help="Only documents modified before this ISO date")
+    args = parser.parse_args()
+
+    ask(args.question, source=args.source, doc_type=args.doc_type, after=args.after, before=args.before)
+    print("\n" + router.report())
@@ -0,0 +1,48 @@
+# file: shards.py
+# Shard layout shared by build_index.py and query_rag.py.
+#
+# A sharded store is a folder of independent Chroma persist directories plus a manifest:
+#   chroma-store/shards.json   {"shard_by": "hash" | "source", "count": N, "shards": ["shard-00", ...]}
+#   chroma-store/shard-00/     one Chroma store per shard
+# Without a manifest, chroma-store/ is a single Chroma store as before.
+import os
+import json
+import hashlib
+
+MANIFEST_FILE = "shards.json"
+
+
+def shard_name(index: int) -> str:
+    return f"shard-{index:02d}"
+
+
+def shard_index(key: str, count: int) -> int:
+    """Stable across runs and machines (unlike hash()), so a chunk always lands in the same shard."""
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest(), 16) % count
+
+
+def shard_for_chunk(chunk_id: str, source: str, manifest: dict) -> int:
+    # "source" keeps a whole document in one shard (scoped queries hit one shard);
+    # "hash" spreads every document's chunks evenly across shards
+    key = source if manifest["shard_by"] == "source" else chunk_id
+    return shard_index(key, manifest["count"])
+
+
+def load_manifest(persist_dir: str):
+    path = os.path.join(persist_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(persist_dir: str, shard_by: str, count: int) -> dict:
+    manifest = {"shard_by": shard_by, "count": count, "shards": [shard_name(i) for i in range(count)]}
+    os.makedirs(persist_dir, exist_ok=True)
+    with open(os.path.join(persist_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def shard_dirs(persist_dir: str, manifest: dict) -> list:
+    return [os.path.join(persist_dir, name) for name in manifest["shards"]]
@@ -0,0 +1,144 @@
+import os
+import argparse
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from corpus import CORPUS_ROOT, normalize_source
+from shards import load_manifest, save_manifest, shard_dirs
+import build_index
+from build_index import PERSIST_DIR, chunk_ids, load_corpus, resolve_manifest
+
+
+class TestNormalizeSource:
+    """Test cases for normalize_source"""
+
+    def test_spellings_give_same_source(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(CORPUS_ROOT)
+        spellings = [
+            "data/x.pdf",
+            "./data/../data/x.pdf",
+            f"../{CORPUS_ROOT.name}/data/x.pdf",
+            str(CORPUS_ROOT / "data" / "x.pdf"),
+        ]
+        assert {normalize_source(p) for p in spellings} == {"data/x.pdf"}
+
+        monkeypatch.chdir(tmp_path)  # Independent of the working directory
+        assert normalize_source(CORPUS_ROOT / "data" / "x.pdf") == "data/x.pdf"
+
+    def test_outside_corpus_root(self, monkeypatch):
+        monkeypatch.chdir(CORPUS_ROOT)
+        assert normalize_source("../data/logiCoT-paper.pdf") == "../data/logiCoT-paper.pdf"
+
+    def test_inline_notes(self):
+        assert normalize_source("inline") == "inline"
+
+    def test_load_corpus_stores_normalized_source(self, tmp_path):
+        path = tmp_path / "notes.md"
+        path.write_text("# Notes", encoding="utf-8")
+
+        docs = load_corpus([str(path)], ingested_at=0)
+
+        assert len(docs) == 1
+        assert docs[0].metadata["source"] == normalize_source(path)
+        assert docs[0].metadata["doc_type"] == "markdown"
+        assert not os.path.isabs(docs[0].metadata["source"])
+
+
+class TestChunkIds:
+    """Test cases for chunk_ids"""
+
+    def make_chunks(self):
+        return [
+            Document(page_content=t, metadata={"source": s, "page": p})
+            for s, p, t in [("a.pdf", 1, "x"), ("a.pdf", 1, "y"), ("a.pdf", 2, "z"), ("b.md", 1, "w")]
+        ]
+
+    def test_ids_number_chunks_per_page(self):
+        chunks = self.make_chunks()
+
+        ids = chunk_ids(chunks)
+
+        assert ids == ["a.pdf:1:1", "a.pdf:1:2", "a.pdf:2:1", "b.md:1:1"]
+        assert [c.metadata["chunk"] for c in chunks] == [1, 2, 1, 1]
+
+    def test_ids_are_stable(self):
+        assert chunk_ids(self.make_chunks()) == chunk_ids(self.make_chunks())
+
+
+class TestResolveManifest:
+    """Test cases for resolve_manifest"""
+
+    def args(self, shards=None, shard_by=None):
+        return argparse.Namespace(shards=shards, shard_by=shard_by)
+
+    def test_unsharded_by_default(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        assert resolve_manifest(self.args()) is None
+        assert load_manifest(PERSIST_DIR) is None
+
+    def test_creates_manifest(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        manifest = resolve_manifest(self.args(shards=3))
+
+        assert manifest["count"] == 3 and manifest["shard_by"] == "hash"
+        assert load_manifest(PERSIST_DIR) == manifest
+        assert resolve_manifest(self.args()) == manifest  # Later runs reuse the layout
+        assert resolve_manifest(self.args(shards=3, shard_by="hash")) == manifest
+
+    @pytest.mark.parametrize("shards, shard_by", [(4, None), (None, "source"), (1, "hash")])
+    def test_refuses_other_layout(self, monkeypatch, tmp_path, shards, shard_by):
+        monkeypatch.chdir(tmp_path)
+        save_manifest(PERSIST_DIR, "hash", 3)
+
+        with pytest.raises(SystemExit):
+            resolve_manifest(self.args(shards=shards, shard_by=shard_by))
+
+    def test_refuses_to_shard_unsharded_store(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        os.makedirs(PERSIST_DIR)
+        open(os.path.join(PERSIST_DIR, "chroma.sqlite3"), "w").close()
+
+        with pytest.raises(SystemExit):
+            resolve_manifest(self.args(shards=3))
+
+
+class TestRebuildShard:
+    """Test cases for build_index.py --rebuild-shard"""
+
+    def shard_contents(self, k):
+        persist_dir = build_index.PERSIST_DIR  # Set by the last run_build() call
+        metadatas = Chroma(persist_directory=shard_dirs(persist_dir, load_manifest(persist_dir))[k]).get()["metadatas"]
+        return sorted((m["source"], m["page"], m["chunk"]) for m in metadatas)
+
+    def fullest_shard(self):
+        return max(range(3), key=lambda k: len({s for s, _, _ in self.shard_contents(k)}))
+
+    def test_rebuild_with_all_paths(self, run_build, corpus):
+        run_build("docs", "--shards", "3")
+        k = self.fullest_shard()
+        before = self.shard_contents(k)
+
+        run_build("docs", "--rebuild-shard", str(k))
+
+        assert self.shard_contents(k) == before
+
+    def test_refuses_without_paths(self, run_build, corpus):
+        run_build("docs", "--shards", "3")
+        before = self.shard_contents(0)
+
+        with pytest.raises(SystemExit):
+            run_build("--rebuild-shard", "0")
+        assert self.shard_contents(0) == before
+
+    def test_refuses_when_paths_miss_documents(self, run_build, corpus, capsys):
+        run_build("docs", "--shards", "3")
+        k = self.fullest_shard()
+        before = self.shard_contents(k)
+        one_source = before[0][0]
+
+        with pytest.raises(SystemExit) as exc:
+            run_build(os.path.join("docs", one_source.rsplit("/", 1)[-1]), "--rebuild-shard", str(k))
+
+        assert self.shard_contents(k) == before
+        missing = {s for s, _, _ in before} - {one_source}
+        assert all(s in str(exc.value) for s in missing)
@@ -0,0 +1,98 @@
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from corpus import CORPUS_ROOT, normalize_source
+from shards import load_manifest, shard_dirs, shard_index
+
+
+class TestBuildFilter:
+    """Test cases for build_filter"""
+
+    def test_no_filter(self, query_rag):
+        assert query_rag.build_filter() is None
+
+    def test_single_clause(self, query_rag):
+        assert query_rag.build_filter(doc_type="pdf") == {"doc_type": "pdf"}
+
+    def test_several_clauses_use_and(self, query_rag):
+        where = query_rag.build_filter(doc_type="pdf", after="2026-02-01", before="2026-03-01T09:30")
+
+        assert where == {"$and": [
+            {"doc_type": "pdf"},
+            {"modified_at": {"$gte": int(datetime(2026, 2, 1).timestamp())}},
+            {"modified_at": {"$lt": int(datetime(2026, 3, 1, 9, 30).timestamp())}},
+        ]}
+
+    def test_source_is_normalized(self, query_rag, monkeypatch):
+        monkeypatch.chdir(CORPUS_ROOT)
+        expected = {"source": "data/x.pdf"}
+
+        assert query_rag.build_filter(source="./data/x.pdf") == expected
+        assert query_rag.build_filter(source=str(CORPUS_ROOT / "data" / "x.pdf")) == expected
+
+
+
+class TestRetrieve:
+    """Test cases for retrieve(): single store vs scatter-gather across shards"""
+
+    QUESTION = "notes on topic 31"
+
+    def use_index(self, query_rag, monkeypatch, persist_dir):
+        """Point query_rag at an index built by run_build, the way it loads chroma-store/ on import."""
+        embeddings = DeterministicFakeEmbedding(size=32)
+        manifest = load_manifest(persist_dir)
+        stores = [
+            Chroma(persist_directory=d, embedding_function=embeddings)
+            for d in (shard_dirs(persist_dir, manifest) if manifest else [persist_dir])
+        ]
+        monkeypatch.setattr(query_rag, "embeddings", embeddings)
+        monkeypatch.setattr(query_rag, "manifest", manifest)
+        monkeypatch.setattr(query_rag, "shard_stores", stores)
+        monkeypatch.setattr(query_rag, "vectorstore", None if manifest else stores[0])
+        monkeypatch.setattr(query_rag, "shard_pool", ThreadPoolExecutor(max_workers=len(stores)) if manifest else None)
+        return manifest, stores
+
+    def retrieve(self, query_rag, persist_dir, **inputs):
+        with pytest.MonkeyPatch.context() as m:
+            self.use_index(query_rag, m, persist_dir)
+            return self.keys(query_rag.retrieve({"question": self.QUESTION, **inputs}))
+
+    def keys(self, docs):
+        return [(d.metadata["source"], d.metadata["page"], d.metadata["chunk"]) for d in docs]
+
+    @pytest.mark.parametrize("shard_by", ["hash", "source"])
+    def test_sharded_top_k_matches_single_store(self, query_rag, run_build, corpus, shard_by):
+        single = run_build("docs")
+        sharded = run_build("docs", "--shards", "3", "--shard-by", shard_by, persist_dir="sharded")
+
+        expected = self.retrieve(query_rag, single)
+
+        assert len(expected) == query_rag.TOP_K
+        assert self.retrieve(query_rag, sharded) == expected
+
+    def test_filter_applies_on_every_shard(self, query_rag, run_build, corpus):
+        single = run_build("docs")
+        sharded = run_build("docs", "--shards", "3", persist_dir="sharded")
+        where = query_rag.build_filter(source="docs/d2.txt")
+
+        hits = self.retrieve(query_rag, sharded, filter=where)
+
+        assert hits == self.retrieve(query_rag, single, filter=where)
+        assert {source for source, _, _ in hits} == {normalize_source("docs/d2.txt")}
+
+    def test_source_query_searches_one_shard(self, query_rag, run_build, corpus, monkeypatch):
+        sharded = run_build("docs", "--shards", "3", "--shard-by", "source", persist_dir="sharded")
+        source = normalize_source("docs/d2.txt")
+        manifest, stores = self.use_index(query_rag, monkeypatch, sharded)
+        searched = []
+        for k, store in enumerate(stores):
+            search = store.similarity_search_by_vector_with_relevance_scores
+            monkeypatch.setattr(store, "similarity_search_by_vector_with_relevance_scores",
+                                lambda *a, _k=k, _search=search, **kw: searched.append(_k) or _search(*a, **kw))
+
+        docs = query_rag.retrieve({"question": self.QUESTION, "filter": {"source": source}, "source": source})
+
+        assert searched == [shard_index(source, manifest["count"])]
+        assert docs and {d.metadata["source"] for d in docs} == {source}
@@ -0,0 +1,39 @@
+from shards import load_manifest, save_manifest, shard_dirs, shard_for_chunk, shard_index, shard_name
+
+
+class TestShardAssignment:
+    """Test cases for shard_index and shard_for_chunk"""
+
+    def test_shard_index_is_stable(self):
+        # Fixed values: changing the hash would silently move chunks between shards
+        assert shard_index("docs/d1.txt", 8) == 1
+        assert shard_index("docs/d1.txt:1:1", 3) == 2
+
+    def test_shard_index_in_range(self):
+        assert {shard_index(f"doc:{i}", 4) for i in range(200)} == {0, 1, 2, 3}
+
+    def test_by_source_keeps_document_together(self):
+        manifest = {"shard_by": "source", "count": 8}
+        shards = {shard_for_chunk(f"a.pdf:{p}:{c}", "a.pdf", manifest) for p in range(1, 5) for c in range(1, 5)}
+        assert shards == {shard_index("a.pdf", 8)}
+
+    def test_by_hash_spreads_chunks(self):
+        manifest = {"shard_by": "hash", "count": 8}
+        chunk_ids = [f"a.pdf:{p}:{c}" for p in range(1, 5) for c in range(1, 5)]
+        assert [shard_for_chunk(i, "a.pdf", manifest) for i in chunk_ids] == [shard_index(i, 8) for i in chunk_ids]
+        assert len({shard_for_chunk(i, "a.pdf", manifest) for i in chunk_ids}) > 1
+
+
+class TestManifest:
+    """Test cases for the shards.json manifest"""
+
+    def test_missing_manifest(self, tmp_path):
+        assert load_manifest(str(tmp_path)) is None
+
+    def test_save_and_load(self, tmp_path):
+        saved = save_manifest(str(tmp_path / "store"), "source", 3)
+
+        assert saved == {"shard_by": "source", "count": 3, "shards": ["shard-00", "shard-01", "shard-02"]}
+        assert load_manifest(str(tmp_path / "store")) == saved
+        assert shard_dirs("store", saved)[2].replace("\\", "/") == "store/shard-02"
+        assert shard_name(12) == "shard-12"
@@ -9,4 +9,5 @@ pip install \
   langchain-chroma \
   chromadb \
   tiktoken \
+  pypdf \
   python-dotenv